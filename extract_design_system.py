@@ -7,15 +7,153 @@ Usage:
 """
 
 import json
+import os
 import sys
+from bisect import bisect_left
+from functools import lru_cache
+from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
-import re
+from types import MappingProxyType
+from typing import Dict, List, Any
+
+# Shared immutable empties used as .get() defaults in the document walk, so
+# nodes missing a key don't allocate a throwaway {} / [] each visit.
+EMPTY_MAP = MappingProxyType({})
+EMPTY_LIST = ()
+
+
+def atomic_write_text(path: Path, text: str):
+    """Write text to a temp file then os.replace it into place.
+
+    Keeps a partially written file from clobbering a previous good output
+    if the process dies mid-write. Skips the write entirely when the file
+    already holds the same content, so reruns on unchanged designs don't
+    touch mtimes and retrigger downstream watchers.
+    """
+    try:
+        if path.read_text() == text:
+            return
+    except OSError:
+        pass
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+# All 256 two-digit hex strings, precomputed so the document walk renders a
+# color channel with an index instead of running the format machinery.
+HEX2 = tuple(f'{i:02x}' for i in range(256))
+
+# Known palette hexes mapped straight to their semantic names. Grays are kept
+# separate because their name needs a shade suffix computed from brightness.
+SEMANTIC_COLORS = {
+    '#ffffff': 'white',
+    '#000000': 'black',
+    '#518ef8': 'primary',
+    '#6257db': 'primary',
+    '#28b446': 'success',
+    '#f14336': 'danger',
+    '#fbbb00': 'warning',
+    '#3b5999': 'facebook',
+}
+
+GRAY_COLORS = frozenset({'#f4f4f4', '#f4f7fa', '#ebebeb', '#d8dee8'})
+
+# Gray shade by average brightness: bisecting the bounds yields an index into
+# the names tuple (<=100 -> '900', <=150 -> '300', ..., >240 -> '50').
+GRAY_SHADE_BOUNDS = (100, 150, 200, 240)
+GRAY_SHADE_NAMES = ('900', '300', '200', '100', '50')
+
+# Font-size floors for semantic text names, checked largest first.
+TYPE_THRESHOLDS = (
+    (32, 'heading'),
+    (20, 'subheading'),
+    (16, 'body'),
+)
+
+# Paint lists inspected for solid colors on every node.
+PAINT_KEYS = ('fills', 'strokes')
+
+# Node types that can qualify as components; membership-only, so a frozenset.
+COMPONENT_NODE_TYPES = frozenset({'RECTANGLE', 'GROUP', 'FRAME'})
+
+# Name keywords checked (in order) when classifying a node as a component.
+COMPONENT_KEYWORDS = (
+    ('button', ('button',)),
+    ('input', ('input', 'field')),
+    ('background', ('bg', 'background')),
+)
+
+# Static component templates emitted by generate_react_components. Hoisted to
+# module level so they are built once at import instead of on every call.
+BUTTON_TEMPLATE = '''import React from 'react';
+import { cn } from '@/lib/utils';
+
+interface ButtonProps extends React.ButtonHTMLAttributes<HTMLButtonElement> {
+  variant?: 'primary' | 'secondary';
+  size?: 'sm' | 'md' | 'lg';
+}
+
+export const Button: React.FC<ButtonProps> = ({
+  className,
+  variant = 'primary',
+  size = 'md',
+  children,
+  ...props
+}) => {
+  return (
+    <button
+      className={cn(
+        'inline-flex items-center justify-center rounded-md font-medium transition-colors',
+        'focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring',
+        'disabled:pointer-events-none disabled:opacity-50',
+        {
+          'bg-primary text-primary-foreground hover:bg-primary/90': variant === 'primary',
+          'bg-secondary text-secondary-foreground hover:bg-secondary/80': variant === 'secondary',
+        },
+        {
+          'h-9 px-3 text-sm': size === 'sm',
+          'h-10 px-4 py-2': size === 'md',
+          'h-11 px-8': size === 'lg',
+        },
+        className
+      )}
+      {...props}
+    >
+      {children}
+    </button>
+  );
+};
+'''
+
+INPUT_TEMPLATE = '''import React from 'react';
+import { cn } from '@/lib/utils';
+
+interface InputProps extends React.InputHTMLAttributes<HTMLInputElement> {}
+
+export const Input: React.FC<InputProps> = ({ className, ...props }) => {
+  return (
+    <input
+      className={cn(
+        'flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm',
+        'ring-offset-background file:border-0 file:bg-transparent file:text-sm file:font-medium',
+        'placeholder:text-muted-foreground focus-visible:outline-none focus-visible:ring-2',
+        'focus-visible:ring-ring focus-visible:ring-offset-2 disabled:cursor-not-allowed disabled:opacity-50',
+        className
+      )}
+      {...props}
+    />
+  );
+};
+'''
 
 
 class DesignSystemExtractor:
     """Extract design tokens and components from Figma JSON"""
 
+    __slots__ = ('figma_json_path', 'output_dir', 'data',
+                 'colors', 'typography', 'components', '_collected')
+
     def __init__(self, figma_json_path: str):
         self.figma_json_path = Path(figma_json_path)
         self.output_dir = Path("design_system_output")
@@ -28,136 +166,129 @@ class DesignSystemExtractor:
         self.colors = set()
         self.typography = []
         self.components = []
+        self._collected = False
+
+    def _collect_from_document(self):
+        """Walk the Figma document once, collecting colors, text styles and
+        components in a single pass instead of one traversal per token kind."""
+        if self._collected:
+            return
+        self._collected = True
+
+        # Bind hot lookups to locals so visit() skips the attribute
+        # resolution through self on every node
+        add_color = self.colors.add
+        add_typography = self.typography.append
+        add_component = self.components.append
+        identify = self._identify_component_type
+
+        # Iterative DFS with an explicit stack: no per-node frame overhead
+        # and no RecursionError on deeply nested documents. Children are
+        # pushed reversed so nodes are visited in the original preorder.
+        stack = [self.data['document']]
+        while stack:
+            node = stack.pop()
+            # Colors from fills and strokes; both paint lists share the same
+            # solid-color shape, so one fused loop handles them
+            for paint_key in PAINT_KEYS:
+                if paint_key in node:
+                    for paint in node[paint_key]:
+                        if paint.get('type') == 'SOLID' and 'color' in paint:
+                            color = paint['color']
+                            add_color('#' + HEX2[int(color['r'] * 255)]
+                                      + HEX2[int(color['g'] * 255)]
+                                      + HEX2[int(color['b'] * 255)])
+
+            # Typography from text nodes
+            if node.get('type') == 'TEXT' and 'style' in node:
+                style = node['style']
+                font_size = style.get('fontSize', 16)
+                font_weight = style.get('fontWeight', 400)
+
+                # Determine semantic type
+                type_name = 'caption'
+                for floor, name in TYPE_THRESHOLDS:
+                    if font_size >= floor:
+                        type_name = name
+                        break
+
+                add_typography({
+                    'name': f"{type_name}-{font_size}",
+                    'fontSize': font_size,
+                    'fontWeight': font_weight,
+                    'fontFamily': style.get('fontFamily', 'Inter'),
+                    'lineHeight': style.get('lineHeight', EMPTY_MAP).get('value', 1.4)
+                })
+
+            # Components from container/shape nodes
+            if node.get('type') in COMPONENT_NODE_TYPES:
+                # Fetch and lowercase the name once; identify() and the
+                # record below reuse it
+                raw_name = node.get('name')
+                comp_type = identify(node, raw_name.lower() if raw_name else '')
+
+                if comp_type != 'unknown':
+                    box = node.get('absoluteBoundingBox', EMPTY_MAP)
+                    add_component({
+                        'name': raw_name,
+                        'type': comp_type,
+                        'width': box.get('width', 0),
+                        'height': box.get('height', 0),
+                        'fills': node.get('fills', EMPTY_LIST),
+                        'strokes': node.get('strokes', EMPTY_LIST),
+                        'cornerRadius': node.get('cornerRadius', 0)
+                    })
+
+            children = node.get('children')
+            if children:
+                stack.extend(reversed(children))
 
     def extract_colors(self) -> Dict[str, str]:
         """Extract all colors from the design"""
         print("🎨 Extracting colors...")
-
-        def extract_from_node(node):
-            # Extract from fills
-            if 'fills' in node:
-                for fill in node['fills']:
-                    if fill.get('type') == 'SOLID' and 'color' in fill:
-                        color = fill['color']
-                        hex_color = '#{:02x}{:02x}{:02x}'.format(
-                            int(color['r'] * 255),
-                            int(color['g'] * 255),
-                            int(color['b'] * 255)
-                        )
-                        self.colors.add(hex_color)
-
-            # Extract from strokes
-            if 'strokes' in node:
-                for stroke in node['strokes']:
-                    if stroke.get('type') == 'SOLID' and 'color' in stroke:
-                        color = stroke['color']
-                        hex_color = '#{:02x}{:02x}{:02x}'.format(
-                            int(color['r'] * 255),
-                            int(color['g'] * 255),
-                            int(color['b'] * 255)
-                        )
-                        self.colors.add(hex_color)
-
-            # Recursively check children
-            if 'children' in node:
-                for child in node['children']:
-                    extract_from_node(child)
-
-        extract_from_node(self.data['document'])
+        self._collect_from_document()
 
         # Categorize colors
         color_palette = self._categorize_colors(sorted(self.colors))
         print(f"   Found {len(self.colors)} colors")
         return color_palette
 
-    def _categorize_colors(self, colors: List[str]) -> Dict[str, str]:
+    @staticmethod
+    def _categorize_colors(colors: List[str]) -> Dict[str, str]:
         """Categorize colors into semantic names"""
         palette = {}
 
         for color in colors:
-            if color == '#ffffff':
-                palette['white'] = color
-            elif color == '#000000':
-                palette['black'] = color
-            elif color in ['#f4f4f4', '#f4f7fa', '#ebebeb', '#d8dee8']:
-                palette[f'gray-{self._get_gray_shade(color)}'] = color
-            elif color in ['#518ef8', '#6257db']:
-                palette['primary'] = color
-            elif color in ['#28b446']:
-                palette['success'] = color
-            elif color in ['#f14336']:
-                palette['danger'] = color
-            elif color in ['#fbbb00']:
-                palette['warning'] = color
-            elif color == '#3b5999':
-                palette['facebook'] = color
-            else:
-                palette[f'color-{len(palette)}'] = color
+            name = SEMANTIC_COLORS.get(color)
+            if name is None:
+                if color in GRAY_COLORS:
+                    name = f'gray-{DesignSystemExtractor._get_gray_shade(color)}'
+                else:
+                    name = f'color-{len(palette)}'
+            palette[name] = color
 
         return palette
 
-    def _get_gray_shade(self, color: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_gray_shade(color: str) -> str:
         """Get gray shade number from hex color"""
-        # Convert hex to RGB to determine brightness
-        hex_color = color.lstrip('#')
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
+        # Convert hex to RGB to determine brightness; bytes.fromhex decodes
+        # all three channels in one C-level call
+        r, g, b = bytes.fromhex(color.lstrip('#'))
         brightness = (r + g + b) / 3
-
-        if brightness > 240:
-            return '50'
-        elif brightness > 200:
-            return '100'
-        elif brightness > 150:
-            return '200'
-        elif brightness > 100:
-            return '300'
-        else:
-            return '900'
+        return GRAY_SHADE_NAMES[bisect_left(GRAY_SHADE_BOUNDS, brightness)]
 
     def extract_typography(self) -> List[Dict[str, Any]]:
         """Extract typography information"""
         print("📝 Extracting typography...")
+        self._collect_from_document()
 
-        def extract_from_node(node):
-            if node.get('type') == 'TEXT' and 'style' in node:
-                style = node['style']
-                font_size = style.get('fontSize', 16)
-                font_weight = style.get('fontWeight', 400)
-
-                # Determine semantic type
-                if font_size >= 32:
-                    type_name = 'heading'
-                elif font_size >= 20:
-                    type_name = 'subheading'
-                elif font_size >= 16:
-                    type_name = 'body'
-                else:
-                    type_name = 'caption'
-
-                self.typography.append({
-                    'name': f"{type_name}-{font_size}",
-                    'fontSize': font_size,
-                    'fontWeight': font_weight,
-                    'fontFamily': style.get('fontFamily', 'Inter'),
-                    'lineHeight': style.get('lineHeight', {}).get('value', 1.4)
-                })
-
-            if 'children' in node:
-                for child in node['children']:
-                    extract_from_node(child)
-
-        extract_from_node(self.data['document'])
-
-        # Remove duplicates
-        unique_typography = []
-        seen = set()
+        # Remove duplicates (first occurrence wins, insertion order kept)
+        unique = {}
         for typo in self.typography:
-            key = (typo['fontSize'], typo['fontWeight'])
-            if key not in seen:
-                seen.add(key)
-                unique_typography.append(typo)
+            unique.setdefault((typo['fontSize'], typo['fontWeight']), typo)
+        unique_typography = list(unique.values())
 
         print(f"   Found {len(unique_typography)} unique text styles")
         return unique_typography
@@ -165,62 +296,36 @@ class DesignSystemExtractor:
     def extract_components(self) -> List[Dict[str, Any]]:
         """Extract component information"""
         print("🧩 Extracting components...")
-
-        def extract_from_node(node, parent_name=""):
-            if node.get('type') in ['RECTANGLE', 'GROUP', 'FRAME']:
-                # Determine component type based on name and properties
-                name = node.get('name', '').lower()
-                comp_type = self._identify_component_type(node, name)
-
-                component = {
-                    'name': node.get('name'),
-                    'type': comp_type,
-                    'width': node.get('absoluteBoundingBox', {}).get('width', 0),
-                    'height': node.get('absoluteBoundingBox', {}).get('height', 0),
-                    'fills': node.get('fills', []),
-                    'strokes': node.get('strokes', []),
-                    'cornerRadius': node.get('cornerRadius', 0)
-                }
-
-                if comp_type != 'unknown':
-                    self.components.append(component)
-
-            if 'children' in node:
-                for child in node['children']:
-                    extract_from_node(child, node.get('name', ''))
-
-        extract_from_node(self.data['document'])
+        self._collect_from_document()
 
         print(f"   Found {len(self.components)} components")
         return self.components
 
-    def _identify_component_type(self, node: Dict[str, Any], name: str) -> str:
+    @staticmethod
+    def _identify_component_type(node: Dict[str, Any], name: str) -> str:
         """Identify component type based on properties"""
-        if 'button' in name:
-            return 'button'
-        elif 'input' in name or 'field' in name:
-            return 'input'
-        elif 'bg' in name or 'background' in name:
-            return 'background'
-        elif node.get('type') == 'RECTANGLE' and node.get('cornerRadius', 0) > 0:
+        for comp_type, keywords in COMPONENT_KEYWORDS:
+            if any(keyword in name for keyword in keywords):
+                return comp_type
+
+        if node.get('type') == 'RECTANGLE' and node.get('cornerRadius', 0) > 0:
             return 'card'
         elif node.get('type') == 'TEXT':
             return 'text'
         else:
             return 'unknown'
 
-    def generate_css_variables(self, colors: Dict[str, str]) -> str:
+    @staticmethod
+    def generate_css_variables(colors: Dict[str, str]) -> str:
         """Generate CSS variables for colors"""
-        css = ":root {\n"
-        css += "  /* Colors */\n"
-        for name, color in colors.items():
-            css += f"  --color-{name}: {color};\n"
-        css += "}\n"
-        return css
-
-    def generate_tailwind_config(self, colors: Dict[str, str], typography: List[Dict[str, Any]]) -> str:
+        variables = '\n'.join(f"  --color-{name}: {color};" for name, color in colors.items())
+        return ":root {\n  /* Colors */\n" + variables + "\n}\n"
+
+    @staticmethod
+    def generate_tailwind_config(colors: Dict[str, str], typography: List[Dict[str, Any]]) -> str:
         """Generate Tailwind configuration"""
-        config = """/** @type {import('tailwindcss').Config} */
+        buf = StringIO()
+        buf.write("""/** @type {import('tailwindcss').Config} */
 export default {
   content: [
     './src/**/*.{js,ts,jsx,tsx,mdx}',
@@ -228,42 +333,44 @@ export default {
   ],
   theme: {
     extend: {
-      colors: {"""
+      colors: {""")
 
         # Add colors
-        for name, color in colors.items():
-            if name != 'white' and name != 'black':
-                config += f"\n        {name}: '{{color}}',"
+        buf.write(''.join(f"\n        {name}: '{color}',"
+                          for name, color in colors.items()
+                          if name != 'white' and name != 'black'))
 
-        config += """
-      },
-      fontFamily: {"""
-
-        # Add font families
+        # Collect families and semantic sizes in one pass over typography.
+        # Size entries keep the first occurrence per name; typography is
+        # deduped by (size, weight) so the same name can repeat.
         fonts = set()
+        sizes = {}
         for typo in typography:
             fonts.add(typo['fontFamily'])
+            sizes.setdefault(typo['name'].split('-')[0], typo['fontSize'])
+
+        buf.write("""
+      },
+      fontFamily: {""")
 
-        for font in sorted(fonts):
-            config += f"\n        '{font.lower().replace(' ', '-')}': ['{font}'],"
+        buf.write(''.join(f"\n        '{font.lower().replace(' ', '-')}': ['{font}'],"
+                          for font in sorted(fonts)))
 
-        config += """
+        buf.write("""
       },
-      fontSize: {"""
+      fontSize: {""")
 
-        # Add font sizes
-        for typo in typography:
-            size_name = typo['name'].split('-')[0]
-            config += f"\n        '{size_name}': ['{typo["fontSize"]}px'],"
+        buf.write(''.join(f"\n        '{name}': ['{size}px'],"
+                          for name, size in sizes.items()))
 
-        config += """
+        buf.write("""
       }
     }
   },
   plugins: [],
-}"""
+}""")
 
-        return config
+        return buf.getvalue()
 
     def generate_react_components(self) -> str:
         """Generate basic React components"""
@@ -271,73 +378,12 @@ export default {
         components_dir.mkdir(exist_ok=True)
 
         # Generate Button component
-        button_code = '''import React from 'react';
-import { cn } from '@/lib/utils';
-
-interface ButtonProps extends React.ButtonHTMLAttributes<HTMLButtonElement> {
-  variant?: 'primary' | 'secondary';
-  size?: 'sm' | 'md' | 'lg';
-}
-
-export const Button: React.FC<ButtonProps> = ({
-  className,
-  variant = 'primary',
-  size = 'md',
-  children,
-  ...props
-}) => {
-  return (
-    <button
-      className={cn(
-        'inline-flex items-center justify-center rounded-md font-medium transition-colors',
-        'focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring',
-        'disabled:pointer-events-none disabled:opacity-50',
-        {
-          'bg-primary text-primary-foreground hover:bg-primary/90': variant === 'primary',
-          'bg-secondary text-secondary-foreground hover:bg-secondary/80': variant === 'secondary',
-        },
-        {
-          'h-9 px-3 text-sm': size === 'sm',
-          'h-10 px-4 py-2': size === 'md',
-          'h-11 px-8': size === 'lg',
-        },
-        className
-      )}
-      {...props}
-    >
-      {children}
-    </button>
-  );
-};
-'''
-
         button_file = components_dir / "Button.tsx"
-        button_file.write_text(button_code)
+        atomic_write_text(button_file, BUTTON_TEMPLATE)
 
         # Generate Input component
-        input_code = '''import React from 'react';
-import { cn } from '@/lib/utils';
-
-interface InputProps extends React.InputHTMLAttributes<HTMLInputElement> {}
-
-export const Input: React.FC<InputProps> = ({ className, ...props }) => {
-  return (
-    <input
-      className={cn(
-        'flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm',
-        'ring-offset-background file:border-0 file:bg-transparent file:text-sm file:font-medium',
-        'placeholder:text-muted-foreground focus-visible:outline-none focus-visible:ring-2',
-        'focus-visible:ring-ring focus-visible:ring-offset-2 disabled:cursor-not-allowed disabled:opacity-50',
-        className
-      )}
-      {...props}
-    />
-  );
-};
-'''
-
         input_file = components_dir / "Input.tsx"
-        input_file.write_text(input_code)
+        atomic_write_text(input_file, INPUT_TEMPLATE)
 
         return str(components_dir)
 
@@ -355,12 +401,12 @@ export const Input: React.FC<InputProps> = ({ className, ...props }) => {
 
         # CSS variables
         css_file = self.output_dir / "design-tokens.css"
-        css_file.write_text(self.generate_css_variables(colors))
+        atomic_write_text(css_file, self.generate_css_variables(colors))
         print(f"   ✅ CSS variables: {css_file}")
 
         # Tailwind config
         tailwind_file = self.output_dir / "tailwind.config.js"
-        tailwind_file.write_text(self.generate_tailwind_config(colors, typography))
+        atomic_write_text(tailwind_file, self.generate_tailwind_config(colors, typography))
         print(f"   ✅ Tailwind config: {tailwind_file}")
 
         # React components
@@ -374,17 +420,16 @@ export const Input: React.FC<InputProps> = ({ className, ...props }) => {
             'typography': typography,
             'components': components
         }
-        tokens_file.write_text(json.dumps(tokens_data, indent=2))
+        atomic_write_text(tokens_file, json.dumps(tokens_data, indent=2))
         print(f"   ✅ Design tokens JSON: {tokens_file}")
 
-        # Summary
-        print(f"\n📊 Extraction Summary:")
-        print(f"   Colors: {len(colors)}")
-        print(f"   Typography styles: {len(typography)}")
-        print(f"   Components identified: {len(components)}")
-        print(f"   Output directory: {self.output_dir}")
-
-        print(f"\n✅ Design system extraction complete!")
+        # Summary, assembled once and written with a single print
+        print(f"\n📊 Extraction Summary:\n"
+              f"   Colors: {len(colors)}\n"
+              f"   Typography styles: {len(typography)}\n"
+              f"   Components identified: {len(components)}\n"
+              f"   Output directory: {self.output_dir}\n"
+              f"\n✅ Design system extraction complete!")
         return self.output_dir
 
 
@@ -4,6 +4,7 @@ Simple Figma API cache - Just get and save JSON
 """
 
 import json
+import os
 from pathlib import Path
 import requests
 
@@ -30,9 +31,12 @@ if response.status_code != 200:
 
 data = response.json()
 
-# Save to file
+# Save to file (write to a temp file first so a failed run can't truncate
+# a previously cached copy)
 output_file = Path(f"figma_{FILE_KEY}.json")
-output_file.write_text(json.dumps(data, indent=2))
+tmp_file = output_file.with_suffix('.json.tmp')
+tmp_file.write_text(json.dumps(data, indent=2))
+os.replace(tmp_file, output_file)
 
 print(f"✅ Saved to {output_file}")
 print(f"📊 File: {data.get('name')}")